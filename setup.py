@@ -4,10 +4,16 @@ setup(
     name='telegram_openai_assistant',
     version='0.1',
     packages=find_packages(),
+    python_requires=">=3.11",
     install_requires=[
-        "python-telegram-bot>=20.8",  
+        "python-telegram-bot>=20.8",
         "openai>=1.16.0",
         "python-dotenv>=1.0.0",
+        "aiohttp>=3.9",
+        'uvloop; platform_system != "Windows"',
+        "xxhash>=3.0",
+        "h2>=4.0",
+        "msgspec>=0.18",
     ]
 ,
     entry_points={
@@ -1,55 +1,273 @@
 from __future__ import annotations
 import asyncio
+import hashlib
 import logging
+import signal
 from typing import List
-from telegram.ext import ApplicationBuilder, Application, CommandHandler, MessageHandler, filters
-from .config import telegram_token_bots, assistant_id_bots
-from .handlers import BotHandlers
+from .config import (
+    admin_user_ids,
+    bot_pairs,
+    use_webhooks,
+    webhook_base_url,
+    webhook_port,
+)
 
-logging.basicConfig(format="%(asctime)s | %(levelname)s | %(name)s | %(message)s", level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_log_listener = None
+
+def _configure_logging() -> None:
+    """Configure root logging once, with formatting off the event loop.
+
+    Handlers attach behind a QueueHandler whose QueueListener thread does
+    the formatting and stderr writes, so a slow terminal or pipe never
+    blocks the loop. Calling this more than once is a no-op.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+    import queue
+    from logging.handlers import QueueHandler, QueueListener
+
+    stream = logging.StreamHandler()
+    stream.setFormatter(
+        logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+    )
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
+    _log_listener = QueueListener(log_queue, stream)
+    _log_listener.start()
+
+class _BotLoggerAdapter(logging.LoggerAdapter):
+    """Prefixes every record with a short bot identifier, so log lines from
+    N bots running in one process stay attributable."""
+
+    def process(self, msg, kwargs):
+        return f"[{self.extra['bot']}] {msg}", kwargs
+
+# telegram/openai imports are deferred to first use: loading telegram.ext at
+# module import drags in httpx, APScheduler and friends, which console-script
+# startup, --help and tooling should not pay for. _load_runtime() builds the
+# shared state exactly once:
+#   - one pooled HTTPX client shared by every bot instead of one per token,
+#     plus a second client dedicated to get_updates so long polling never
+#     head-of-line blocks outgoing replies;
+#   - the text filter and BotCommand list, so the filter tree and command
+#     objects are not rebuilt per bot.
+_TEXT_FILTER = None
+_COMMAND_LIST: tuple = ()
+_shared_request = None
+_shared_get_updates_request = None
+
+def _load_runtime() -> None:
+    """Import PTB and build the shared clients and constants on first use."""
+    global _TEXT_FILTER, _COMMAND_LIST, _shared_request, _shared_get_updates_request
+    if _shared_request is not None:
+        return
+    from telegram import BotCommand
+    from telegram.ext import filters
+    from telegram.request import HTTPXRequest
+
+    try:
+        from .request import MsgspecRequest as request_cls
+    except ImportError:
+        request_cls = HTTPXRequest
+
+    class _SharedRequest(request_cls):
+        """Request client shared across Applications.
+
+        Bot.shutdown() closes its request objects unconditionally, so the
+        first bot to finish teardown would close the pool while sibling
+        bots are still draining replies. Ignore per-application shutdown;
+        start_bots() closes the pool for real via shutdown_shared().
+        """
+
+        async def shutdown(self) -> None:
+            pass
+
+        async def close(self) -> None:
+            await super().shutdown()
+
+    _TEXT_FILTER = filters.TEXT & ~filters.COMMAND
+    _COMMAND_LIST = (
+        BotCommand("start", "Start the bot"),
+        BotCommand("help", "Show help"),
+    )
+    pool_size = max(32, 4 * len(bot_pairs))
+    # HTTP/2 multiplexes concurrent sendMessage calls over one TLS stream;
+    # the get_updates client stays on HTTP/1.1 since long polling only ever
+    # has one request in flight per bot.
+    _shared_request = _SharedRequest(connection_pool_size=pool_size, http_version="2")
+    _shared_get_updates_request = _SharedRequest(connection_pool_size=pool_size)
+
+async def shutdown_shared() -> None:
+    """Close the shared HTTPX clients once all bots have stopped."""
+    if _shared_request is not None:
+        await _shared_request.close()
+        await _shared_get_updates_request.close()
+
 class Bot:
-    def __init__(self, telegram_token: str, assistant_id: str) -> None:
+    def __init__(self, telegram_token: str, assistant_id: str, stop_event: asyncio.Event) -> None:
         self.telegram_token = telegram_token
         self.assistant_id = assistant_id
-        self.application: Application = ApplicationBuilder().token(self.telegram_token).build()
+        self._stop_event = stop_event
+        self.log = _BotLoggerAdapter(logger, {"bot": assistant_id[:8]})
+        _load_runtime()
+        from telegram.ext import ApplicationBuilder
+        from .handlers import BotHandlers
+
+        self.application = (
+            ApplicationBuilder()
+            .token(self.telegram_token)
+            .request(_shared_request)
+            .get_updates_request(_shared_get_updates_request)
+            # No scheduled jobs anywhere in this project, so skip the
+            # APScheduler instance (and its thread) every Application
+            # would otherwise carry.
+            .job_queue(None)
+            .arbitrary_callback_data(False)
+            # Assistant runs take seconds; without this, one slow answer
+            # blocks every other user of the same bot.
+            .concurrent_updates(True)
+            .build()
+        )
         self.handlers = BotHandlers(self.assistant_id, self.telegram_token)
+        # Token digest used as the bot's URL path in webhook mode, so the
+        # raw token never appears in URLs or access logs.
+        self.url_path = hashlib.sha256(self.telegram_token.encode()).hexdigest()[:16]
         self._setup_handlers()
-        self._stop_event: asyncio.Event | None = None
 
     def _setup_handlers(self) -> None:
+        from telegram.ext import CommandHandler, MessageHandler, filters
+
         self.application.add_handler(CommandHandler("start", self.handlers.start))
         self.application.add_handler(CommandHandler("help", self.handlers.help_command))
-        self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handlers.process_message))
+        # The reply cache is process-wide, so flushing it is admin-only;
+        # without configured admin IDs the command is not registered at all.
+        if admin_user_ids:
+            self.application.add_handler(
+                CommandHandler(
+                    "cache_flush",
+                    self.handlers.cache_flush,
+                    filters=filters.User(user_id=admin_user_ids),
+                )
+            )
+        self.application.add_handler(MessageHandler(_TEXT_FILTER, self.handlers.process_message))
 
     async def run(self) -> None:
+        from telegram import Update
+
         await self.application.initialize()
-        await self.application.bot.set_my_commands([("start", "Start the bot"), ("help", "Show help")])
         await self.application.start()
-        await self.application.updater.start_polling()
-        self._stop_event = asyncio.Event()
+        if use_webhooks:
+            # Push delivery: the shared server in webhook.py feeds this
+            # application's update queue, so no polling task runs at all.
+            await asyncio.gather(
+                self.application.bot.set_my_commands(_COMMAND_LIST),
+                self.application.bot.set_webhook(
+                    url=f"{webhook_base_url}/{self.url_path}",
+                    allowed_updates=[Update.MESSAGE],
+                ),
+            )
+        else:
+            # set_my_commands does not depend on polling, so run both in
+            # one round trip instead of paying each call's latency
+            # serially. The long poll timeout lets Telegram hold the
+            # connection until an update arrives instead of returning
+            # empty polls every few seconds, and restricting
+            # allowed_updates to messages shrinks the payloads.
+            await asyncio.gather(
+                self.application.bot.set_my_commands(_COMMAND_LIST),
+                self.application.updater.start_polling(
+                    timeout=30,
+                    poll_interval=0.0,
+                    bootstrap_retries=-1,
+                    allowed_updates=[Update.MESSAGE],
+                ),
+            )
+        self.log.info("Bot started.")
         await self._stop_event.wait()
+        if not use_webhooks:
+            await self.application.updater.stop()
         await self.application.stop()
         await self.application.shutdown()
+        self.log.info("Bot stopped.")
 
     async def stop(self) -> None:
-        if self._stop_event:
-            self._stop_event.set()
+        self._stop_event.set()
 
 async def start_bots() -> None:
-    if not telegram_token_bots or not assistant_id_bots:
+    if not bot_pairs:
         logger.error("No tokens or assistant IDs detected.")
         return
-    bots: List[Bot] = [Bot(token, asst_id) for token, asst_id in zip(telegram_token_bots, assistant_id_bots)]
+    # One stop event shared by every bot: signal delivery is a single set()
+    # rather than N per-bot notifications, and stop() can never race run().
+    stop_event = asyncio.Event()
+    bots: List[Bot] = [Bot(token, asst_id, stop_event) for token, asst_id in bot_pairs]
     logger.info("Launching %d bot(s)…", len(bots))
-    await asyncio.gather(*(bot.run() for bot in bots))
+
+    def _request_stop() -> None:
+        logger.info("Stop signal received, shutting down…")
+        stop_event.set()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, _request_stop)
+    tasks = [bot.run() for bot in bots]
+    if use_webhooks:
+        from .webhook import run_webhook_server
+
+        tasks.append(run_webhook_server(bots, webhook_port, stop_event))
+    try:
+        if hasattr(asyncio, "TaskGroup"):
+            # Structured concurrency: one failing bot cancels its
+            # siblings and the group waits for every cleanup to finish
+            # before propagating, which gather does not guarantee.
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    for task in tasks:
+                        tg.create_task(task)
+            except asyncio.CancelledError:
+                logger.info("Bot tasks cancelled; finishing shutdown.")
+        else:  # pre-3.11 runtimes
+            await asyncio.gather(*tasks)
+    finally:
+        from .clients import close_openai_client
+
+        await shutdown_shared()
+        await close_openai_client()
 
 def main() -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    _configure_logging()
+    # uvloop's libuv-based loop cuts per-syscall overhead for this
+    # many-sockets I/O-bound workload; fall back to the stdlib loop where
+    # it is unavailable (e.g. Windows).
+    try:
+        import uvloop
+        loop = uvloop.new_event_loop()
+    except ImportError:
+        loop = asyncio.new_event_loop()
+    # The default executor sizes itself to cpu_count + 4 threads per loop;
+    # this program only uses it for the occasional sync call, so cap it at
+    # a small fixed pool instead of letting idle worker threads pile up.
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=4, thread_name_prefix="bot-exec")
+    )
+    asyncio.set_event_loop(loop)
     try:
-        asyncio.run(start_bots())
+        loop.run_until_complete(start_bots())
     except KeyboardInterrupt:
         logger.info("Shutdown requested.")
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.run_until_complete(loop.shutdown_default_executor())
+        loop.close()
+        if _log_listener is not None:
+            _log_listener.stop()
 
 if __name__ == "__main__":
     main()
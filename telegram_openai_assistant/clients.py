@@ -0,0 +1,19 @@
+# clients.py
+# Process-wide API clients shared by every bot, so connection pools and TLS
+# session state are allocated once rather than once per token.
+
+import httpx
+from openai import AsyncOpenAI
+
+from .config import client_api_key
+
+_limits = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+openai_client = AsyncOpenAI(
+    api_key=client_api_key,
+    http_client=httpx.AsyncClient(limits=_limits, http2=True),
+)
+
+
+async def close_openai_client() -> None:
+    """Close the shared OpenAI client's connection pool."""
+    await openai_client.close()
@@ -5,6 +5,10 @@ import os
 # Load the environment variables from the .env file.
 load_dotenv()
 
+def _env_flag(name):
+    """True only for explicitly truthy values, so FLAG=0 / FLAG=false stay off."""
+    return os.getenv(name, "").strip().lower() in {"1", "true", "yes"}
+
 # Retrieve TELEGRAM_TOKEN as a comma-separated string and split it into a list
 telegram_token_bots = os.getenv("TELEGRAM_TOKEN", "").split(",")
 
@@ -13,10 +17,35 @@ assistant_id_bots = os.getenv("ASSISTANT_ID", "").split(",")
 
 client_api_key = os.getenv("CLIENT_API_KEY")
 
+# Cache assistant replies in memory so repeated prompts skip the OpenAI call.
+enable_reply_cache = _env_flag("ENABLE_REPLY_CACHE")
+
+# Telegram user IDs allowed to run admin commands such as /cache_flush,
+# comma-separated. Admin commands are not registered when this is empty.
+admin_user_ids = tuple(
+    int(uid.strip()) for uid in os.getenv("ADMIN_USER_IDS", "").split(",") if uid.strip()
+)
+
+# Webhook mode: when USE_WEBHOOKS is set, Telegram pushes updates to one
+# shared HTTP server instead of each bot long-polling.
+use_webhooks = _env_flag("USE_WEBHOOKS")
+webhook_base_url = os.getenv("WEBHOOK_BASE_URL", "").rstrip("/")
+webhook_port = int(os.getenv("WEBHOOK_PORT", "8443"))
+
+if use_webhooks and not webhook_base_url:
+    raise RuntimeError(
+        "USE_WEBHOOKS is set but WEBHOOK_BASE_URL is empty; set WEBHOOK_BASE_URL "
+        "to the public https URL Telegram should deliver updates to."
+    )
+
 # Optional: Clean up whitespace from each item in the lists
 telegram_token_bots = [token.strip() for token in telegram_token_bots if token.strip()]
 assistant_id_bots = [aid.strip() for aid in assistant_id_bots if aid.strip()]
 
+# Pair each token with its assistant ID up front; zip(strict=True) raises at
+# import on a mismatched .env instead of silently launching fewer bots.
+bot_pairs = tuple(zip(telegram_token_bots, assistant_id_bots, strict=True))
+
 # Debugging print to verify the lists (remove in production)
 print("Telegram Tokens:", telegram_token_bots)
 print("Assistant IDs:", assistant_id_bots)
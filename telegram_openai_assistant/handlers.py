@@ -1,17 +1,50 @@
+import asyncio
+import hashlib
 import time
 import datetime
+from collections import OrderedDict
 from telegram.ext import CallbackContext
 from telegram import Update
-from openai import OpenAI
-from .config import client_api_key
+from .clients import openai_client
+from .config import enable_reply_cache
 from .utils import get_message_count, update_message_count, save_qa
 
-client = OpenAI(api_key=client_api_key)
+# Bounded LRU of recent assistant replies, shared by all bots and enabled via
+# ENABLE_REPLY_CACHE. A cache hit skips the whole assistant run (seconds of
+# latency plus OpenAI tokens); entries expire after _CACHE_TTL seconds.
+_CACHE_MAX_SIZE = 1024
+_CACHE_TTL = 3600.0
+_reply_cache = OrderedDict()
+
+# Cap on in-flight assistant runs per bot, so concurrent update processing
+# cannot fan out into OpenAI rate-limit errors.
+_MAX_CONCURRENT_RUNS = 16
+
+try:
+    from xxhash import xxh3_64_intdigest
+except ImportError:
+    xxh3_64_intdigest = None
+
+
+def _cache_key(assistant_id, prompt):
+    """Build the cache key for a prompt sent to a given assistant.
+
+    xxh3 is non-cryptographic, but nothing here needs collision
+    resistance — at chat-message volumes a 64-bit collision is
+    implausible — and on short strings it is several times faster than
+    blake2b, which only remains as a fallback when xxhash is missing.
+    """
+    if xxh3_64_intdigest is not None:
+        # Hash the encoded bytes: xxhash 4.x rejects str input.
+        return (assistant_id, xxh3_64_intdigest(prompt.encode()))
+    return (assistant_id, hashlib.blake2b(prompt.encode(), digest_size=16).digest())
 
 class BotHandlers:
-    def __init__(self, assistant_id: str, telegram_id: str):
+    def __init__(self, assistant_id: str, telegram_id: str, client=openai_client):
         self.assistant_id = assistant_id
         self.telegram_id = telegram_id
+        self.client = client
+        self._run_semaphore = asyncio.Semaphore(_MAX_CONCURRENT_RUNS)
 
     async def start(self, update: Update, context: CallbackContext) -> None:
         """Sends a welcome message to the user."""
@@ -26,26 +59,57 @@ class BotHandlers:
             text="Just send me a question and I'll try to answer it.",
         )
 
-    def get_answer(self, message_str) -> None:
+    async def cache_flush(self, update: Update, context: CallbackContext) -> None:
+        """Empties the reply cache so fresh answers are fetched again."""
+        _reply_cache.clear()
+        await context.bot.send_message(
+            chat_id=update.effective_chat.id, text="Reply cache cleared."
+        )
+
+    def _cached_answer(self, message_str):
+        """Return a cached reply for this prompt, or None on miss/expiry."""
+        key = _cache_key(self.assistant_id, message_str)
+        entry = _reply_cache.get(key)
+        if entry is None:
+            return None
+        answer, inserted_at = entry
+        if time.monotonic() - inserted_at >= _CACHE_TTL:
+            del _reply_cache[key]
+            return None
+        _reply_cache.move_to_end(key)
+        return answer
+
+    def _store_answer(self, message_str, answer):
+        """Insert a reply into the cache, evicting the oldest entries."""
+        _reply_cache[_cache_key(self.assistant_id, message_str)] = (
+            answer,
+            time.monotonic(),
+        )
+        while len(_reply_cache) > _CACHE_MAX_SIZE:
+            _reply_cache.popitem(last=False)
+
+    async def get_answer(self, message_str) -> None:
         """Get answer from assistant using the assistant_id."""
-        thread = client.beta.threads.create()
-        client.beta.threads.messages.create(
+        thread = await self.client.beta.threads.create()
+        await self.client.beta.threads.messages.create(
             thread_id=thread.id, role="user", content=message_str
         )
 
-        run = client.beta.threads.runs.create(
+        run = await self.client.beta.threads.runs.create(
             thread_id=thread.id,
             assistant_id=self.assistant_id,  # Use the assistant_id passed when creating the handler
         )
 
-        # Poll for the response (this could be improved with async calls)
+        # Poll for the response without blocking the event loop
         while True:
-            run = client.beta.threads.runs.retrieve(thread_id=thread.id, run_id=run.id)
+            run = await self.client.beta.threads.runs.retrieve(
+                thread_id=thread.id, run_id=run.id
+            )
             if run.status == "completed":
                 break
-            time.sleep(1)
+            await asyncio.sleep(1)
 
-        messages = client.beta.threads.messages.list(thread_id=thread.id)
+        messages = await self.client.beta.threads.messages.list(thread_id=thread.id)
         response = messages.dict()["data"][0]["content"][0]["text"]["value"]
         return response
 
@@ -66,7 +130,12 @@ class BotHandlers:
         if count >= 100:
             return
 
-        answer = self.get_answer(message_text)
+        answer = self._cached_answer(message_text) if enable_reply_cache else None
+        if answer is None:
+            async with self._run_semaphore:
+                answer = await self.get_answer(message_text)
+            if enable_reply_cache:
+                self._store_answer(message_text, answer)
         await context.bot.send_message(chat_id=update.effective_chat.id, text=answer)
         update_message_count(count + 1)
         save_qa(
@@ -0,0 +1,21 @@
+# request.py
+# msgspec-backed JSON parsing for Telegram responses. msgspec decodes the
+# payload bytes in C, replacing the pure-Python json path on the per-update
+# hot loop; PTB still builds its Update objects from the decoded dicts, so
+# no de_json contract is touched.
+
+import msgspec
+from telegram.error import TelegramError
+from telegram.request import HTTPXRequest
+
+_decoder = msgspec.json.Decoder()
+
+
+class MsgspecRequest(HTTPXRequest):
+    """HTTPXRequest that parses Telegram's JSON payloads with msgspec."""
+
+    def parse_json_payload(self, payload: bytes):
+        try:
+            return _decoder.decode(payload)
+        except msgspec.DecodeError as exc:
+            raise TelegramError("Invalid server response") from exc
@@ -1,8 +1,14 @@
-from dotenv import load_dotenv
-import os
+# testscript.py
+# Diagnostic: prints the configuration the bots will actually run with, going
+# through config.py's own env parsing (comma splitting, whitespace cleanup,
+# strict pairing) so a bad .env shows up here instead of at bot startup.
 
-load_dotenv()
+from telegram_openai_assistant.config import (
+    telegram_token_bots,
+    assistant_id_bots,
+    client_api_key,
+)
 
-print("TELEGRAM_TOKEN_BOT:", os.getenv("TELEGRAM_TOKEN"))
-print("ASSISTANT_ID_BOT:", os.getenv("ASSISTANT_ID"))
-print("CLIENT_API_KEY:", os.getenv("CLIENT_API_KEY"))
+print("TELEGRAM_TOKEN (parsed):", telegram_token_bots)
+print("ASSISTANT_ID (parsed):", assistant_id_bots)
+print("CLIENT_API_KEY:", client_api_key)
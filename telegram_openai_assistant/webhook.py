@@ -0,0 +1,57 @@
+# webhook.py
+# One aiohttp server shared by every bot: N bots share a single TCP
+# listener and accept loop, with one URL path per bot feeding that
+# application's update queue.
+
+import logging
+
+from aiohttp import web
+from telegram import Update
+
+logger = logging.getLogger(__name__)
+
+# Inbound updates are parsed on every webhook hit; decode them in C with
+# msgspec (same parser the request module uses for API responses), falling
+# back to stdlib json when it is not installed.
+try:
+    from msgspec.json import Decoder as _JSONDecoder
+
+    _decode = _JSONDecoder().decode
+except ImportError:
+    import json
+
+    _decode = json.loads
+
+
+def _make_route(application):
+    """Build the request handler that feeds one application's update queue."""
+
+    async def handle(request: web.Request) -> web.Response:
+        try:
+            data = _decode(await request.read())
+            update = Update.de_json(data, application.bot)
+        except Exception:
+            # A garbage body must not escape as a 500 with a traceback;
+            # anything that is not a well-formed update is the sender's fault.
+            logger.warning("Rejected malformed webhook payload on %s", request.path)
+            return web.Response(status=400)
+        await application.update_queue.put(update)
+        return web.Response()
+
+    return handle
+
+
+async def run_webhook_server(bots, port, stop_event) -> None:
+    """Serve webhook updates for every bot on one shared listener until stopped."""
+    app = web.Application()
+    for bot in bots:
+        app.router.add_post(f"/{bot.url_path}", _make_route(bot.application))
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "0.0.0.0", port)
+    await site.start()
+    logger.info("Webhook server listening on port %d for %d bot(s)", port, len(bots))
+    try:
+        await stop_event.wait()
+    finally:
+        await runner.cleanup()